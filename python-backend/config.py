@@ -14,6 +14,7 @@ CHUNK_OVERLAP = 80
 
 # Search/retrieval configuration
 TOP_K_RESULTS = 5
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "16"))  # Threads for blocking search SDK calls
 
 # ChromaDB configuration
 CHROMA_DB_PATH = "./chroma_db/file_upload"
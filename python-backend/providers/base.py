@@ -2,8 +2,12 @@
 Base utilities for all LLM providers - shared streaming and formatting functions.
 """
 import asyncio
-import json
-from typing import AsyncIterator, Optional, Union
+import contextlib
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+import httpx
+import orjson
 
 from utils.schemas import RequestState
 
@@ -11,25 +15,92 @@ from utils.schemas import RequestState
 # Type alias for chunk iterators
 ChunkIterator = AsyncIterator[Union[str, tuple[str, Optional[str]]]]
 
+# Cached SDK clients keyed by (provider, api_key), least recently used first
+_CLIENTS: OrderedDict[tuple[str, str], Any] = OrderedDict()
+_MAX_CLIENTS = 32
+
+# Chunks already queued within this many seconds of the last SSE frame are batched together,
+# unless the buffered text grows past COALESCE_MAX_CHARS
+COALESCE_WINDOW = 0.005
+COALESCE_MAX_CHARS = 256
+
+# Provider chunks buffered ahead of the SSE writer
+STREAM_QUEUE_SIZE = 8
+
+# Marks the end of the provider stream in the chunk queue
+_STREAM_END = object()
+
+
+def get_client(provider: str, key: str, factory: Callable[[], Any]) -> Any:
+    """
+    Get a cached SDK client for a provider/API key pair, creating it on first use.
+    Reusing clients keeps their connection pools (and TLS sessions) alive across requests.
+    
+    Args:
+        provider: Provider name used as part of the cache key
+        key: API key used as part of the cache key
+        factory: Zero-argument callable that builds a new client
+    """
+    cache_key = (provider, key)
+    client = _CLIENTS.get(cache_key)
+    if client is None:
+        client = factory()
+        _CLIENTS[cache_key] = client
+        if len(_CLIENTS) > _MAX_CLIENTS:
+            # Not closed here: the evicted client may still be streaming another request's
+            # response, so it is left to the garbage collector once that finishes
+            _CLIENTS.popitem(last=False)
+    else:
+        _CLIENTS.move_to_end(cache_key)
+    return client
+
+
+async def _close_client(client: Any) -> None:
+    """Close an SDK client's connection pool, whichever close method the SDK exposes."""
+    # google-genai keeps its async transport on the .aio sub-client
+    client = getattr(client, "aio", client)
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    with contextlib.suppress(Exception):
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+async def close_clients() -> None:
+    """Close all cached SDK clients (call on shutdown)."""
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    await asyncio.gather(*(_close_client(client) for client in clients))
+
+
+def pooled_http_client() -> httpx.AsyncClient:
+    """Create an async httpx client with keep-alive pooling for OpenAI-compatible SDKs."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+
 
 def convert_messages(conversation: list) -> list[dict]:
     """Convert conversation messages to dict format for API calls."""
     return [{"role": msg.role, "content": msg.content} for msg in conversation]
 
 
-async def format_chunk(
+def format_chunk(
     content: str,
     model: str,
     sources: Optional[dict] = None,
     thinking: Optional[str] = None
-) -> str:
-    """Format a chunk for SSE streaming."""
+) -> bytes:
+    """Format a chunk as an SSE frame (bytes, ready for the response body)."""
     data = {"content": content, "model": model}
     if sources is not None:
         data["sources"] = sources
     if thinking is not None:
         data["thinking"] = thinking
-    return f"data: {json.dumps(data)}\n\n"
+    return b"data: " + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
 
 
 async def stream_response(
@@ -37,29 +108,106 @@ async def stream_response(
     model_name: str,
     state: RequestState,
     sources: Optional[dict] = None
-) -> AsyncIterator[str]:
+) -> AsyncIterator[bytes]:
     """
     Universal streaming wrapper that handles both simple chunks and (content, thinking) tuples.
-    Sources are sent only with the first chunk.
+    The provider stream is read by a producer task into a bounded queue, so provider I/O
+    overlaps with SSE writes, and a watcher task cancels the producer as soon as the
+    client disconnects (closing the provider stream mid-chunk).
+    Chunks already waiting in the queue are merged into one frame for up to COALESCE_WINDOW
+    (flushed early once COALESCE_MAX_CHARS are buffered); buffered text is flushed as soon as
+    the queue runs dry, so it never waits on the next provider chunk.
+    Sources are sent only with the first frame.
     """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    pending_content: list[str] = []
+    pending_thinking: list[str] = []
+    pending_chars = 0
+    last_flush = 0.0
     sent_sources = False
-    try:
-        async for chunk in chunk_iterator:
-            if state.is_disconnected():
-                break
-            
-            # Normalize chunk to (content, thinking) tuple
-            if isinstance(chunk, tuple):
-                content, thinking = chunk
-            else:
-                content, thinking = chunk, None
-            
-            if content or thinking:
-                if not sent_sources and sources:
-                    yield await format_chunk(content, model_name, sources, thinking)
-                    sent_sources = True
+    error: Optional[Exception] = None
+    
+    # Frames reuse a prebuilt JSON scaffold; only the text fields are encoded per frame
+    frame_prefix = b'data: {"content":'
+    thinking_key = b',"thinking":'
+    frame_suffix = b',"model":' + orjson.dumps(model_name) + b'}\n\n'
+    
+    def flush() -> bytes:
+        nonlocal sent_sources, pending_chars
+        content = "".join(pending_content)
+        thinking = "".join(pending_thinking) or None
+        pending_content.clear()
+        pending_thinking.clear()
+        pending_chars = 0
+        if not sent_sources and sources:
+            sent_sources = True
+            return format_chunk(content, model_name, sources, thinking)
+        if thinking is None:
+            return frame_prefix + orjson.dumps(content) + frame_suffix
+        return frame_prefix + orjson.dumps(content) + thinking_key + orjson.dumps(thinking) + frame_suffix
+    
+    async def produce() -> None:
+        try:
+            async for chunk in chunk_iterator:
+                await queue.put(chunk)
+            await queue.put(_STREAM_END)
+        except asyncio.CancelledError:
+            # Wake the consumer if there is room; a full queue wakes it anyway
+            with contextlib.suppress(asyncio.QueueFull):
+                queue.put_nowait(_STREAM_END)
+            raise
+        except Exception as e:
+            # Provider errors are handed to the consumer rather than failing the task group
+            await queue.put(e)
+    
+    async def watch_disconnect(producer: asyncio.Task) -> None:
+        await state.wait_disconnected()
+        producer.cancel()
+    
+    async with asyncio.TaskGroup() as tg:
+        producer = tg.create_task(produce())
+        watcher = tg.create_task(watch_disconnect(producer))
+        try:
+            while True:
+                chunk = await queue.get()
+                if state.is_disconnected():
+                    return
+                if chunk is _STREAM_END:
+                    break
+                if isinstance(chunk, Exception):
+                    error = chunk
+                    break
+                
+                # Normalize chunk to (content, thinking) tuple
+                if isinstance(chunk, tuple):
+                    content, thinking = chunk
                 else:
-                    yield await format_chunk(content, model_name, thinking=thinking)
-                await asyncio.sleep(0.01)
-    except Exception as e:
-        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                    content, thinking = chunk, None
+                
+                if content:
+                    pending_content.append(content)
+                    pending_chars += len(content)
+                if thinking:
+                    pending_thinking.append(thinking)
+                    pending_chars += len(thinking)
+                
+                if pending_chars and (
+                    queue.empty()
+                    or pending_chars >= COALESCE_MAX_CHARS
+                    or loop.time() - last_flush >= COALESCE_WINDOW
+                ):
+                    yield flush()
+                    last_flush = loop.time()
+        except GeneratorExit:
+            # Response closed by the server; leave the task group cleanly instead of
+            # letting it wrap GeneratorExit in an exception group
+            return
+        finally:
+            watcher.cancel()
+            producer.cancel()
+    
+    if pending_chars and not state.is_disconnected():
+        yield flush()
+    if error is not None:
+        yield b"data: " + orjson.dumps({"error": str(error)}) + b"\n\n"
@@ -4,8 +4,15 @@ Gemini provider - Google Gemini API streaming with thinking support.
 from typing import AsyncIterator, Optional
 from google import genai
 from google.genai import types
+from providers.base import get_client
 from utils.schemas import ChatRequest
 
+
+def _client(key: str) -> genai.Client:
+    """Get the shared Gemini client for an API key."""
+    return get_client("gemini", key, lambda: genai.Client(api_key=key))
+
+
 def gemini_prompt_format(prompt: list):
 
     content = []
@@ -32,20 +39,20 @@ def gemini_prompt_format(prompt: list):
 
 async def gemini_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional[str]]]:
     """Extract content and thinking chunks from Gemini stream."""
-    client = genai.Client(api_key=request.model.key)
+    client = _client(request.model.key)
     config = types.GenerateContentConfig(
         response_mime_type="text/plain",
         thinking_config=types.ThinkingConfig(thinking_level="HIGH", include_thoughts=True)
     )
     prompt = gemini_prompt_format(request.conversation)
     
-    stream = client.models.generate_content_stream(
+    stream = await client.aio.models.generate_content_stream(
         model=request.model.name,
         contents=prompt,
         config=config
     )
     
-    for chunk in stream:
+    async for chunk in stream:
         if not chunk.candidates:
             continue
             
@@ -68,10 +75,10 @@ async def gemini_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Option
 
 async def gemini_completion(request: ChatRequest) -> str:
     """Non-streaming chat completion for Gemini."""
-    client = genai.Client(api_key=request.model.key)
+    client = _client(request.model.key)
     prompt = gemini_prompt_format(request.conversation)
     
-    response = client.models.generate_content(
+    response = await client.aio.models.generate_content(
         model=request.model.name,
         contents=prompt
     )
@@ -1,21 +1,30 @@
 """
 Groq provider - Groq API streaming with thinking/reasoning support.
 """
+import re
 from typing import AsyncIterator, Optional
-from groq import Groq
+from groq import AsyncGroq
 
-from providers.base import convert_messages
+from providers.base import convert_messages, get_client, pooled_http_client
 from utils.schemas import ChatRequest
 
+# Splits content on think tags, keeping the tags as separate parts
+_THINK_TAG_RE = re.compile(r'(<think>|</think>)')
+
+
+def _client(key: str) -> AsyncGroq:
+    """Get the shared Groq client for an API key."""
+    return get_client("groq", key, lambda: AsyncGroq(api_key=key, http_client=pooled_http_client()))
+
 
 async def groq_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional[str]]]:
     """
     Extract content and reasoning chunks from Groq stream.
     Handles both 'reasoning' field and <think></think> tag parsing.
     """
-    client = Groq(api_key=request.model.key)
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    stream = client.chat.completions.create(
+    stream = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=True,
@@ -23,12 +32,12 @@ async def groq_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional
     
     in_think_block = False
     
-    for chunk in stream:
+    async for chunk in stream:
         if not (chunk and chunk.choices):
             continue
             
         delta = chunk.choices[0].delta
-        content = getattr(delta, 'content', None) or ''
+        content = delta.content or ''
         reasoning = getattr(delta, 'reasoning', None)
         
         # If reasoning field exists, use it directly
@@ -41,29 +50,22 @@ async def groq_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional
         if not content:
             continue
             
+        # Fast path: plain content outside a think block (the common case)
+        if not in_think_block and '<think>' not in content:
+            yield (content, None)
+            continue
+        
         # Parse <think></think> tags from content
         result_content, result_thinking = "", ""
-        temp_content = content
-        
-        while temp_content:
-            if not in_think_block:
-                think_start = temp_content.find('<think>')
-                if think_start != -1:
-                    result_content += temp_content[:think_start]
-                    temp_content = temp_content[think_start + 7:]
-                    in_think_block = True
-                else:
-                    result_content += temp_content
-                    temp_content = ""
+        for part in _THINK_TAG_RE.split(content):
+            if part == '<think>':
+                in_think_block = True
+            elif part == '</think>':
+                in_think_block = False
+            elif in_think_block:
+                result_thinking += part
             else:
-                think_end = temp_content.find('</think>')
-                if think_end != -1:
-                    result_thinking += temp_content[:think_end]
-                    temp_content = temp_content[think_end + 8:]
-                    in_think_block = False
-                else:
-                    result_thinking += temp_content
-                    temp_content = ""
+                result_content += part
         
         if result_content or result_thinking:
             yield (result_content, result_thinking or None)
@@ -71,9 +73,9 @@ async def groq_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional
 
 async def groq_completion(request: ChatRequest) -> str:
     """Non-streaming chat completion for Groq."""
-    client = Groq(api_key=request.model.key)
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=False,
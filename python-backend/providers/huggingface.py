@@ -2,31 +2,36 @@
 HuggingFace provider - HuggingFace Inference API streaming.
 """
 from typing import AsyncIterator
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient
 
-from providers.base import convert_messages
+from providers.base import convert_messages, get_client
 from utils.schemas import ChatRequest
 
 
+def _client(key: str) -> AsyncInferenceClient:
+    """Get the shared HuggingFace client for an API key (model is passed per call)."""
+    return get_client("huggingface", key, lambda: AsyncInferenceClient(token=key))
+
+
 async def huggingface_chunks(request: ChatRequest) -> AsyncIterator[str]:
     """Extract content chunks from HuggingFace stream."""
-    client = InferenceClient(request.model.name, token=request.model.key)
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    stream = client.chat.completions.create(
+    stream = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=True,
     )
-    for chunk in stream:
-        if chunk and chunk.choices[0].delta.content:
-            yield chunk.choices[0].delta.content
+    async for chunk in stream:
+        if chunk and chunk.choices and (content := chunk.choices[0].delta.content):
+            yield content
 
 
 async def huggingface_completion(request: ChatRequest) -> str:
     """Non-streaming chat completion for HuggingFace."""
-    client = InferenceClient(request.model.name, token=request.model.key)
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=False,
@@ -4,15 +4,20 @@ Ollama provider - local LLM streaming via Ollama.
 from typing import AsyncIterator, Optional
 import ollama
 
-from providers.base import convert_messages
+from providers.base import convert_messages, get_client
 from utils.schemas import ChatRequest
 
 
+def _client() -> ollama.AsyncClient:
+    """Get the shared async Ollama client."""
+    return get_client("ollama", "", ollama.AsyncClient)
+
+
 async def ollama_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional[str]]]:
     """Extract content and thinking chunks from Ollama stream."""
     messages = convert_messages(request.conversation)
-    stream = ollama.chat(model=request.model.name, messages=messages, stream=True)
-    for chunk in stream:
+    stream = await _client().chat(model=request.model.name, messages=messages, stream=True)
+    async for chunk in stream:
         if chunk:
             message = chunk.get('message', {})
             content = message.get('content') or ''
@@ -24,5 +29,5 @@ async def ollama_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Option
 async def ollama_completion(request: ChatRequest) -> str:
     """Non-streaming chat completion for Ollama."""
     messages = convert_messages(request.conversation)
-    response = ollama.chat(model=request.model.name, messages=messages, stream=False)
+    response = await _client().chat(model=request.model.name, messages=messages, stream=False)
     return response.get('message', {}).get('content', '').strip()
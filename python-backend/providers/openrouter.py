@@ -2,25 +2,34 @@
 OpenRouter provider - OpenRouter API streaming (OpenAI-compatible).
 """
 from typing import AsyncIterator, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 
-from providers.base import convert_messages
+from providers.base import convert_messages, get_client, pooled_http_client
 from utils.schemas import ChatRequest
 
 
+def _client(key: str) -> AsyncOpenAI:
+    """Get the shared OpenRouter client for an API key."""
+    return get_client("openrouter", key, lambda: AsyncOpenAI(
+        api_key=key,
+        base_url='https://openrouter.ai/api/v1',
+        http_client=pooled_http_client(),
+    ))
+
+
 async def openrouter_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Optional[str]]]:
     """Extract content and reasoning chunks from OpenRouter stream."""
-    client = OpenAI(api_key=request.model.key, base_url='https://openrouter.ai/api/v1')
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    stream = client.chat.completions.create(
+    stream = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=True,
     )
-    for chunk in stream:
+    async for chunk in stream:
         if chunk and chunk.choices:
             delta = chunk.choices[0].delta
-            content = getattr(delta, 'content', None) or ''
+            content = delta.content or ''
             reasoning = getattr(delta, 'reasoning', None)
             if content or reasoning:
                 yield (content, reasoning)
@@ -28,9 +37,9 @@ async def openrouter_chunks(request: ChatRequest) -> AsyncIterator[tuple[str, Op
 
 async def openrouter_completion(request: ChatRequest) -> str:
     """Non-streaming chat completion for OpenRouter."""
-    client = OpenAI(api_key=request.model.key, base_url='https://openrouter.ai/api/v1')
+    client = _client(request.model.key)
     messages = convert_messages(request.conversation)
-    response = client.chat.completions.create(
+    response = await client.chat.completions.create(
         model=request.model.name,
         messages=messages,
         stream=False,
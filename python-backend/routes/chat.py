@@ -1,9 +1,9 @@
 """
 Chat routes - handles the main chat endpoint with streaming support.
 """
-import re
+import asyncio
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 
 from utils.prompts import PROMPT_WITH_CONTEXT, BASE_PROMPT
 from utils.schemas import ChatRequest, Message, RequestState
@@ -18,10 +18,10 @@ router = APIRouter(tags=["chat"])
 
 def filter_conversation(conversation: List[Message]) -> List[Message]:
     """Filter out empty or invalid messages from the conversation."""
-    def is_valid(content: str) -> bool:
-        return bool(content and content.strip() and content.lower() != "undefined")
-    
-    return [msg for msg in conversation if is_valid(msg.content)]
+    return [
+        msg for msg in conversation
+        if msg.content and (stripped := msg.content.strip()) and stripped.lower() != "undefined"
+    ]
 
 
 def build_prompt(query: str, context: str, source_map: Optional[dict]) -> Message:
@@ -35,26 +35,28 @@ def build_prompt(query: str, context: str, source_map: Optional[dict]) -> Messag
     else:
         content = f"{query}{BASE_PROMPT}"
     
-    content = re.sub(r"[^\S\n]+", " ", content)
-    
     return Message(role="user", content=content)
 
 
+async def watch_disconnect(http_request: Request, state: RequestState) -> None:
+    """Listen on the ASGI receive channel once and flag the request when the client goes away."""
+    while True:
+        message = await http_request.receive()
+        if message["type"] == "http.disconnect":
+            state.mark_disconnected()
+            return
+
+
 @router.post("/api/chat")
-async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
+async def chat(request: ChatRequest, http_request: Request, background_tasks: BackgroundTasks):
     """Handle chat request with streaming response."""
-    from server import app  # Import here to avoid circular import
-    
-    # Track request
-    request_id = id(request)
-    if not hasattr(app.state, 'active_requests'):
-        app.state.active_requests = set()
-    app.state.active_requests.add(request_id)
+    # A single watcher task sets the disconnect flag for the stream
+    state = RequestState(id(request))
+    watcher = asyncio.create_task(watch_disconnect(http_request, state))
     
     # Schedule cleanup
     async def cleanup():
-        if hasattr(app.state, 'active_requests'):
-            app.state.active_requests.discard(request_id)
+        watcher.cancel()
     background_tasks.add_task(cleanup)
 
     # Prepare conversation
@@ -85,10 +87,9 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     formatted_message = build_prompt(current_message.content, context, source_map)
     request.conversation = history + [formatted_message]
 
-    # Create request state and dispatch to provider
-    state = RequestState(request_id, app)
-    
+    # Dispatch to provider
     try:
         return await chat_stream(request, state, source_map)
     except ValueError as e:
+        watcher.cancel()
         raise HTTPException(status_code=400, detail=str(e))
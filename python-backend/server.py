@@ -6,10 +6,15 @@ sys.dont_write_bytecode = True
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
+from providers.base import close_clients as close_provider_clients
 from services.file_upload.vector_store import clear_database
+from services.web_search.scraper import close_client as close_scraper_client, shutdown_parse_pool
+from services.web_search.search import shutdown_search_pool
 from routes import router
+from utils.embeddings import get_embedding_model
 from utils.logging import server_logger
 
 log = server_logger()
@@ -18,7 +23,8 @@ log = server_logger()
 app = FastAPI(
     title="LLM Chat API",
     description="API for interacting with various LLM models with streaming support",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -32,16 +38,22 @@ app.add_middleware(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Manage app lifecycle - initialize and cleanup request tracking."""
+    """Manage app lifecycle - load shared resources and release them on shutdown."""
     # Clear file upload database at startup for fresh state
     clear_database()
     log.info("File upload database cleared")
     
-    app.state.active_requests = set()
-    log.info("Server started, request tracking initialized")
+    # Load and warm up the embedding model so the first query skips model load
+    get_embedding_model().encode(["warmup"])
+    log.info("Embedding model loaded")
+    
+    log.info("Server started")
     yield
-    app.state.active_requests.clear()
-    log.info("Server shutdown, request tracking cleared")
+    await close_scraper_client()
+    await close_provider_clients()
+    shutdown_parse_pool()
+    shutdown_search_pool()
+    log.info("Server shutdown")
 
 app.router.lifespan_context = lifespan
 
@@ -51,4 +63,6 @@ app.include_router(router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop is not available on Windows; fall back to the stdlib loop there
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop=loop, http="httptools")
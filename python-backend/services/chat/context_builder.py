@@ -3,11 +3,15 @@ Context Builder Service - Orchestrates RAG context building from multiple source
 Extracts web search and file context, merges source maps, and prepares final prompt.
 """
 from typing import List, Optional, Tuple
+import asyncio
+import hashlib
+import os
 import time
 
 from utils.schemas import Message, ModelInfo, FileContext
 from utils.sources import process_search_results
 from utils.logging import context_builder_logger
+from utils.cache import SingleFlight, TTLCache
 from services.web_search.search import search_and_scrape as search
 from services.web_search.faiss import chunk_docs, faiss_search
 from services.web_search.query_expander import expand_search_query
@@ -15,6 +19,34 @@ from services.file_upload.vector_store import query_documents, cleanup_orphaned_
 
 log = context_builder_logger()
 
+# Web search results keyed by (normalized query, hashed Tavily key), and in-flight searches
+# so concurrent identical queries share one computation
+_web_cache = TTLCache(maxsize=256, ttl=600)
+_web_searches = SingleFlight(_web_cache, should_cache=lambda result: bool(result[0]))
+# Caps concurrent chunk+embed jobs in the thread pool to the number of cores
+_embed_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+
+def _rank_chunks(docs: list, query: str) -> Tuple[str, Optional[dict]]:
+    """Chunk scraped documents and rank them against the query (CPU-bound)."""
+    chunks = chunk_docs(docs=docs)
+    return faiss_search(chunks=chunks, user_query=query)
+
+
+async def _search_web(query: str, tavily_api_key: str) -> Tuple[str, Optional[dict]]:
+    """Run the search -> scrape -> chunk -> rank pipeline for a query."""
+    start_time = time.time()
+    results = await search(query=query, tavily_api_key=tavily_api_key)
+    if not results:
+        return "", None
+    
+    # Embedding is blocking compute, so keep it off the event loop
+    async with _embed_semaphore:
+        search_results = await asyncio.to_thread(_rank_chunks, results, query)
+    log.info(f"Web search took {time.time() - start_time:.2f}s")
+    
+    return search_results
+
 
 async def build_web_context(
     query: str,
@@ -42,17 +74,16 @@ async def build_web_context(
     )
     log.info(f"Original: '{query[:80]}...' -> Expanded: '{expanded_query}'")
     
-    # Perform web search
-    start_time = time.time()
-    results = await search(query=expanded_query, tavily_api_key=tavily_api_key)
-    if not results:
-        return "", None
-    
-    chunks = chunk_docs(docs=results)
-    search_results = faiss_search(chunks=chunks, user_query=expanded_query)
-    log.info(f"Web search took {time.time() - start_time:.2f}s")
+    # Serve repeated queries from cache
+    key_hash = hashlib.sha256(tavily_api_key.encode()).hexdigest()
+    cache_key = (expanded_query.strip().lower(), key_hash)
+    cached = _web_cache.get(cache_key)
+    if cached is not None:
+        log.info("Web search cache hit")
+        return cached
     
-    return search_results
+    # Perform web search, joining an identical in-flight search if there is one
+    return await _web_searches.run(cache_key, lambda: _search_web(expanded_query, tavily_api_key))
 
 
 def build_file_context(
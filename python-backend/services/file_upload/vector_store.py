@@ -14,6 +14,9 @@ from utils.logging import vector_store_logger
 log = vector_store_logger()
 
 
+# Rank by cosine similarity, matching the embedding model's training objective
+COLLECTION_METADATA = {"hnsw:space": "cosine"}
+
 # Singleton ChromaDB client
 _client: Optional[chromadb.PersistentClient] = None
 _collection = None
@@ -27,7 +30,8 @@ def get_collection():
         _client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
         _collection = _client.get_or_create_collection(
             name=CHROMA_COLLECTION,
-            embedding_function=ChromaEmbeddingAdapter()
+            embedding_function=ChromaEmbeddingAdapter(),
+            metadata=COLLECTION_METADATA
         )
     return _collection
 
@@ -61,7 +65,8 @@ def _try_recreate_collection() -> bool:
     
     _collection = _client.get_or_create_collection(
         name=CHROMA_COLLECTION,
-        embedding_function=ChromaEmbeddingAdapter()
+        embedding_function=ChromaEmbeddingAdapter(),
+        metadata=COLLECTION_METADATA
     )
     log.info(f"Recreated empty collection '{CHROMA_COLLECTION}'")
     return True
@@ -180,8 +185,8 @@ def query_documents(
             filename = meta.get("filename", "unknown")
             page = meta.get("page", 1)
             source = f"{filename}#page={page}"
-            # Convert distance to similarity score (ChromaDB uses L2 distance)
-            score = 1.0 / (1.0 + dist)
+            # Convert cosine distance to cosine similarity (higher is better)
+            score = 1.0 - dist
             formatted.append((doc, score, source))
     
     return formatted
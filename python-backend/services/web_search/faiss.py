@@ -2,35 +2,55 @@
 FAISS module - handles document chunking, embedding, and similarity search.
 """
 import faiss
+import numpy as np
 from langchain_core.documents import Document
 from utils.sources import process_search_results
-from utils.embeddings import FastEmbedModel
+from utils.embeddings import get_embedding_model
 from utils.chunking import split_documents
 from config import TOP_K_RESULTS
 
+# Below this many chunks a single NumPy matmul beats building any FAISS index
+NUMPY_SEARCH_THRESHOLD = 2_000
+
+# Below this many chunks a brute-force scan beats a partitioned IVF index
+FLAT_INDEX_THRESHOLD = 10_000
+
+# IVF-PQ settings for large corpora (each vector compressed to PQ_SUBQUANTIZERS bytes)
+PQ_SUBQUANTIZERS = 48
+IVF_NPROBE = 16
+
 
 def chunk_docs(docs: list[Document]) -> list[Document]:
     """Split documents into smaller chunks for embedding."""
     return split_documents(docs)
 
 
-def build_index(chunks: list[Document], model) -> faiss.Index:
-    """Build a FAISS HNSW index from document chunks."""
-    texts = [doc.page_content for doc in chunks]
-    embeddings = model.encode(texts)
-    
-    dim = embeddings.shape[1]
-    index = faiss.IndexHNSWFlat(dim, 32)
-    index.hnsw.efConstruction = 100
-    index.hnsw.efSearch = 64
+def build_index(embeddings: np.ndarray) -> faiss.Index:
+    """
+    Build a FAISS index from chunk embeddings.
+    Uses an int8 scalar-quantized inner-product scan on normalized embeddings
+    for moderate chunk counts, and an IVF-PQ index for large ones.
+    """
+    count, dim = embeddings.shape
+    if count < FLAT_INDEX_THRESHOLD:
+        index = faiss.IndexScalarQuantizer(
+            dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+        )
+    else:
+        nlist = int(4 * np.sqrt(count))
+        # Sub-quantizer count must divide the embedding dimension
+        m = next(m for m in range(min(PQ_SUBQUANTIZERS, dim), 0, -1) if dim % m == 0)
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, 8, faiss.METRIC_INNER_PRODUCT)
+        index.nprobe = IVF_NPROBE
+    index.train(embeddings)
     index.add(embeddings)
     
     return index
 
 
 def search(
-    query: str, 
-    model, 
+    query_embedding: np.ndarray, 
     index: faiss.Index, 
     chunks: list[Document], 
     top_k: int = TOP_K_RESULTS
@@ -41,16 +61,44 @@ def search(
     Returns:
         List of (chunk_content, score, source_url) tuples
     """
-    query_embedding = model.encode([query])
     distances, indices = index.search(query_embedding, top_k)
+    return _format_results(chunks, distances[0], indices[0])
+
+
+def _numpy_topk(
+    doc_embeddings: np.ndarray,
+    query_embedding: np.ndarray,
+    k: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine top-k with a single matrix-vector product.
+    Expects L2-normalized embeddings.
     
+    Returns:
+        Tuple of (scores, indices), best match first
+    """
+    scores = doc_embeddings @ query_embedding[0]
+    
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return scores[top], top
+
+
+def _format_results(
+    chunks: list[Document],
+    scores: np.ndarray,
+    indices: np.ndarray
+) -> list[tuple[str, float, str]]:
+    """Map search hits back to (chunk_content, score, source_url) tuples."""
     return [
         (
             chunks[i].page_content,
-            float(distances[0][idx]),
+            float(score),
             chunks[i].metadata.get('source', 'Unknown')
         )
-        for idx, i in enumerate(indices[0])
+        for score, i in zip(scores, indices)
+        if i != -1
     ]
 
 
@@ -70,12 +118,25 @@ def faiss_search(
     Returns:
         Tuple of (context_string, source_map)
     """
-    model = FastEmbedModel()
-    index = build_index(chunks, model)
-    results = search(user_query, model, index, chunks, top_k)
+    if not chunks:
+        return process_search_results([])
+    
+    model = get_embedding_model()
+    
+    # Encode the query together with the corpus in a single pass
+    texts = [user_query] + [doc.page_content for doc in chunks]
+    embeddings = model.encode(texts)
+    
+    # Normalize in place once so every search path ranks by cosine similarity
+    faiss.normalize_L2(embeddings)
+    query_embedding, doc_embeddings = embeddings[:1], embeddings[1:]
     
-    # Clean up
-    del index
+    if len(chunks) < NUMPY_SEARCH_THRESHOLD:
+        scores, indices = _numpy_topk(doc_embeddings, query_embedding, top_k)
+        results = _format_results(chunks, scores, indices)
+    else:
+        index = build_index(doc_embeddings)
+        results = search(query_embedding, index, chunks, top_k)
     
     return process_search_results(results)
 
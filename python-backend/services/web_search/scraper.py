@@ -4,15 +4,20 @@ Returns LangChain Document objects for easy integration.
 """
 
 import asyncio
+import multiprocessing
+import os
 import re
-from dataclasses import dataclass
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup, Comment
+from lxml import etree, html
 from langchain_core.documents import Document
-from markdownify import markdownify as md
+from utils.cache import SingleFlight, TTLCache
 from utils.logging import scraper_logger
 
 log = scraper_logger()
@@ -39,6 +44,72 @@ class ScrapedPage:
         )
 
 
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+
+@dataclass
+class _LoopState:
+    """
+    HTTP client and page caches owned by one event loop.
+    The client's connections, the in-flight fetch tasks and TTLCache are all bound to
+    (or unsafe outside) the loop that uses them, so each loop gets its own.
+    """
+    # Shared HTTP client for the whole web search pipeline (Tavily API calls and page fetches),
+    # so keep-alive connections and TLS sessions survive across searches and scrape batches
+    client: Optional[httpx.AsyncClient] = None
+    # Recently scraped pages by URL, and in-flight fetches so duplicate requests share one download
+    page_cache: TTLCache = field(default_factory=lambda: TTLCache(maxsize=512, ttl=600))
+    page_fetches: SingleFlight = field(init=False)
+
+    def __post_init__(self):
+        self.page_fetches = SingleFlight(self.page_cache, should_cache=lambda page: page.success)
+
+
+# State for the server's event loop, and for the background loop of the synchronous scrape() wrapper
+_server_state = _LoopState()
+_sync_state = _LoopState()
+
+# Background event loop for the synchronous scrape() wrapper
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _loop_state() -> _LoopState:
+    """Return the client and caches belonging to the calling event loop."""
+    try:
+        on_sync_loop = _sync_loop is not None and asyncio.get_running_loop() is _sync_loop
+    except RuntimeError:
+        on_sync_loop = False
+    return _sync_state if on_sync_loop else _server_state
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get or create the HTTP client shared by web search and scraping on the calling loop."""
+    state = _loop_state()
+    if state.client is None or state.client.is_closed:
+        state.client = httpx.AsyncClient(
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=50,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return state.client
+
+
+async def close_client() -> None:
+    """Close the shared scraper HTTP client (called on server shutdown)."""
+    if _server_state.client is not None:
+        await _server_state.client.aclose()
+        _server_state.client = None
+
+
 # Elements that typically don't contain useful content
 NOISE_TAGS = [
     'script', 'style', 'noscript', 'iframe', 'svg', 
@@ -62,186 +133,466 @@ NOISE_PATTERNS = [
     r'more', r'read-more', r'see-also', r'also-read',
 ]
 
+# Precompiled patterns (built once, reused for every page)
+_NOISE_RE = re.compile('|'.join(NOISE_PATTERNS), re.IGNORECASE)
+# Class/ID keywords that mark an element as likely main content
+_CONTENT_RE = re.compile(r'main|content|article|post|body|text', re.IGNORECASE)
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+_BLANK_LINE_RE = re.compile(r'\n[ \t]+(?=\n)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Drops comments and processing instructions while parsing
+_HTML_PARSER = html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+
+# Responses are parsed incrementally in blocks of this size, and abandoned past MAX_HTML_BYTES
+STREAM_CHUNK_BYTES = 65536
+MAX_HTML_BYTES = 5 * 1024 * 1024
+# Markdown beyond this many characters is cut off, so one huge page can't dominate chunking/embedding
+MAX_MARKDOWN_CHARS = 100_000
+
+# Pages larger than this are converted in a worker process instead of on the event loop
+OFFLOAD_THRESHOLD_BYTES = 50 * 1024
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get or create the process pool used for large HTML -> markdown conversions."""
+    global _parse_pool
+    if _parse_pool is None:
+        # Forking the multi-threaded server process can deadlock workers on inherited locks;
+        # forkserver (spawn on Windows) starts them from a clean interpreter instead
+        method = "spawn" if sys.platform == "win32" else "forkserver"
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(method),
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the HTML conversion process pool (called on server shutdown)."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+def _collapse(text: Optional[str]) -> str:
+    """Collapse runs of whitespace in an HTML text node to single spaces."""
+    return _WHITESPACE_RE.sub(' ', text) if text else ''
+
+
+def _inline(element: html.HtmlElement) -> str:
+    """Render an element's children (text, child elements and their tails) as markdown."""
+    parts = [_collapse(element.text)]
+    for child in element:
+        parts.append(_emit_markdown(child))
+        parts.append(_collapse(child.tail))
+    return ''.join(parts)
+
+
+def _block(element: html.HtmlElement) -> str:
+    text = _inline(element).strip()
+    return f'\n\n{text}\n\n' if text else ''
+
+
+def _heading(level: int):
+    def render(element: html.HtmlElement) -> str:
+        text = _inline(element).strip()
+        return f'\n\n{"#" * level} {text}\n\n' if text else ''
+    return render
+
+
+def _wrap(marker: str):
+    def render(element: html.HtmlElement) -> str:
+        text = _inline(element)
+        stripped = text.strip()
+        if not stripped:
+            return text
+        # Keep surrounding spaces outside the markers so the markdown stays valid
+        leading = ' ' if text[0].isspace() else ''
+        trailing = ' ' if text[-1].isspace() else ''
+        return f'{leading}{marker}{stripped}{marker}{trailing}'
+    return render
+
+
+def _link(element: html.HtmlElement) -> str:
+    text = _inline(element).strip()
+    href = element.get('href')
+    return f'[{text}]({href})' if text and href else text
+
+
+def _list(element: html.HtmlElement) -> str:
+    ordered = element.tag == 'ol'
+    items = []
+    for index, item in enumerate(element.iterchildren('li'), 1):
+        text = _inline(item).strip()
+        if text:
+            bullet = f'{index}.' if ordered else '-'
+            items.append(f'{bullet} ' + text.replace('\n', '\n  '))
+    return '\n\n' + '\n'.join(items) + '\n\n' if items else ''
+
+
+def _pre(element: html.HtmlElement) -> str:
+    code = element.text_content().strip('\n')
+    return f'\n\n```\n{code}\n```\n\n' if code.strip() else ''
+
+
+def _code(element: html.HtmlElement) -> str:
+    code = element.text_content()
+    return f'`{code}`' if code.strip() else code
+
+
+def _blockquote(element: html.HtmlElement) -> str:
+    text = _inline(element).strip()
+    if not text:
+        return ''
+    return '\n\n' + '\n'.join(f'> {line}' for line in text.splitlines()) + '\n\n'
+
+
+def _table_cells(row: html.HtmlElement) -> list[str]:
+    # Cells must stay on one line for the row to remain part of the table
+    return [' '.join(_inline(cell).split()) for cell in row.iterchildren('td', 'th')]
+
+
+def _table_row(element: html.HtmlElement) -> str:
+    cells = _table_cells(element)
+    return '\n| ' + ' | '.join(cells) + ' |' if any(cells) else ''
+
+
+def _table(element: html.HtmlElement) -> str:
+    """Render a table, with a header separator after its first row (as markdownify did)."""
+    lines = []
+    for row in element.xpath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr'):
+        cells = _table_cells(row)
+        if not any(cells):
+            continue
+        lines.append('| ' + ' | '.join(cells) + ' |')
+        if len(lines) == 1:
+            lines.append('| ' + ' | '.join('---' for _ in cells) + ' |')
+    return '\n\n' + '\n'.join(lines) + '\n\n' if lines else ''
+
+
+_MARKDOWN_RENDERERS = {
+    **{f'h{level}': _heading(level) for level in range(1, 7)},
+    **dict.fromkeys(
+        ('p', 'div', 'section', 'article', 'main', 'body', 'dl', 'dd', 'dt'),
+        _block,
+    ),
+    'ul': _list,
+    'ol': _list,
+    'a': _link,
+    'strong': _wrap('**'),
+    'b': _wrap('**'),
+    'em': _wrap('*'),
+    'i': _wrap('*'),
+    'code': _code,
+    'pre': _pre,
+    'blockquote': _blockquote,
+    'table': _table,
+    'tr': _table_row,
+    'br': lambda element: '\n',
+    'hr': lambda element: '\n\n---\n\n',
+}
+
+
+# Childless, textless tags that render to markdown and must survive the empty-element prune
+_VOID_RENDERED_TAGS = frozenset(('br', 'hr'))
+
+
+def _emit_markdown(element: html.HtmlElement) -> str:
+    """Render a single element (without its tail) as markdown, dispatching on its tag."""
+    if not isinstance(element.tag, str) or element.tag in ('script', 'style'):
+        return ''
+    renderer = _MARKDOWN_RENDERERS.get(element.tag, _inline)
+    return renderer(element)
+
 
-def clean_html(soup: BeautifulSoup) -> BeautifulSoup:
-    """Remove noise elements from HTML to extract main content."""
+def _text(element: html.HtmlElement) -> str:
+    """Concatenate stripped text of an element (like BeautifulSoup's get_text(strip=True))."""
+    return ''.join(t.strip() for t in element.itertext())
+
+
+def _drop(element: html.HtmlElement) -> None:
+    """Remove an element from the tree, keeping its tail text."""
+    if element.getparent() is not None:
+        element.drop_tree()
+
+
+def clean_html(root: html.HtmlElement) -> html.HtmlElement:
+    """
+    Remove noise elements from HTML to extract main content.
+    Classifies elements in a single top-down walk (skipping subtrees already marked
+    for removal), then prunes empty elements in one bottom-up pass.
+    Noise tags are expected to be stripped already (see tree_to_markdown).
+    """
     
-    # Remove comments
-    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-        comment.extract()
+    # Text length per element, computed at most once during the walk
+    text_lengths: dict[html.HtmlElement, int] = {}
     
-    # Remove noise tags
-    for tag in NOISE_TAGS:
-        for element in list(soup.find_all(tag)):
-            element.decompose()
+    def text_length(element: html.HtmlElement) -> int:
+        length = text_lengths.get(element)
+        if length is None:
+            length = text_lengths[element] = len(_text(element))
+        return length
     
-    # Remove elements with noisy class/id patterns
-    noise_regex = re.compile('|'.join(NOISE_PATTERNS), re.IGNORECASE)
-    elements_to_remove = []
-    for element in soup.find_all(True):
-        if not element.name:
+    to_remove = []
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        tag = element.tag
+        if element is not root and _is_noise(element, tag, text_length):
+            to_remove.append(element)
             continue
-        classes = ' '.join(element.get('class', []) or [])
-        element_id = element.get('id', '') or ''
-        if noise_regex.search(classes) or noise_regex.search(element_id):
-            # Don't remove if it's likely main content
-            if not any(x in classes.lower() or x in element_id.lower() 
-                      for x in ['main', 'content', 'article', 'post', 'body', 'text']):
-                elements_to_remove.append(element)
-    for element in elements_to_remove:
-        try:
-            element.decompose()
-        except Exception:
-            pass
-    
-    # Remove link lists (ul/ol that are mostly links)
-    for list_elem in list(soup.find_all(['ul', 'ol'])):
-        items = list_elem.find_all('li', recursive=False)
+        # Push children in reverse so they are visited in document order
+        stack.extend(child for child in reversed(element) if isinstance(child.tag, str))
+    
+    for element in to_remove:
+        _drop(element)
+    
+    # Remove empty elements bottom-up, so parents see their children already pruned.
+    # Line breaks and rules are empty by definition but still render as markdown.
+    for element in reversed(list(root.iter(tag=etree.Element))):
+        if (
+            element is not root
+            and element.tag not in _VOID_RENDERED_TAGS
+            and len(element) == 0
+            and not (element.text or '').strip()
+        ):
+            _drop(element)
+    
+    return root
+
+
+def _is_noise(element: html.HtmlElement, tag: str, text_length) -> bool:
+    """Decide whether an element is navigation/boilerplate rather than content."""
+    
+    # Elements with noisy class/id patterns, unless they look like main content
+    classes = element.get('class', '')
+    element_id = element.get('id', '')
+    if _NOISE_RE.search(classes) or _NOISE_RE.search(element_id):
+        if not (_CONTENT_RE.search(classes) or _CONTENT_RE.search(element_id)):
+            return True
+    
+    # Link lists (ul/ol where more than 70% of items are short links)
+    if tag in ('ul', 'ol'):
+        items = element.findall('li')
         if items:
-            link_items = sum(1 for item in items if item.find('a') and len(item.get_text(strip=True)) < 100)
-            if link_items / len(items) > 0.7:  # More than 70% are link items
-                try:
-                    list_elem.decompose()
-                except Exception:
-                    pass
-    
-    # Remove standalone links that aren't part of text content
-    links_to_remove = []
-    for a_tag in soup.find_all('a'):
-        parent = a_tag.parent
-        if parent and parent.name in ['li', 'div', 'span']:
-            parent_text = parent.get_text(strip=True)
-            link_text = a_tag.get_text(strip=True)
-            # If the link is almost all the text in its parent, it's likely navigation
-            if parent_text and link_text and len(link_text) / len(parent_text) > 0.9:
-                if len(link_text) < 80:  # Short links are usually navigation
-                    links_to_remove.append(a_tag)
-    for a_tag in links_to_remove:
-        try:
-            a_tag.decompose()
-        except Exception:
-            pass
-    
-    # Remove divs that are primarily links
-    divs_to_remove = []
-    for div in soup.find_all('div'):
-        if not div.name:
-            continue
-        text = div.get_text(strip=True)
-        links = div.find_all('a')
-        if links and text:
-            link_text_total = sum(len(a.get_text(strip=True)) for a in links)
-            if link_text_total / len(text) > 0.8:  # 80% of text is links
-                divs_to_remove.append(div)
-    for div in divs_to_remove:
-        try:
-            div.decompose()
-        except Exception:
-            pass
-    
-    # Remove empty elements
-    for element in list(soup.find_all(True)):
-        try:
-            if element.name and not element.get_text(strip=True):
-                element.decompose()
-        except Exception:
-            pass
-    
-    return soup
-
-
-def find_main_content(soup: BeautifulSoup) -> BeautifulSoup:
+            link_items = sum(
+                1 for item in items
+                if item.find('.//a') is not None and text_length(item) < 100
+            )
+            return link_items / len(items) > 0.7
+        return False
+    
+    # Standalone short links that make up almost all of their parent's text
+    if tag == 'a':
+        parent = element.getparent()
+        if parent is not None and parent.tag in ('li', 'div', 'span'):
+            parent_length = text_length(parent)
+            link_length = text_length(element)
+            if parent_length and link_length and link_length / parent_length > 0.9:
+                return link_length < 80
+        return False
+    
+    # Divs where more than 80% of the text is links
+    if tag == 'div':
+        links = element.findall('.//a')
+        div_length = text_length(element)
+        if links and div_length:
+            return sum(text_length(a) for a in links) / div_length > 0.8
+    
+    return False
+
+
+# Priority selectors for main content
+_CONTENT_XPATHS = [
+    etree.XPath(expr) for expr in (
+        '//article',
+        '//main',
+        '//*[@role="main"]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " post-content ")]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " article-content ")]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " entry-content ")]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]',
+        '//*[@id="content"]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " post ")]',
+        '//*[contains(concat(" ", normalize-space(@class), " "), " article ")]',
+    )
+]
+
+
+def find_main_content(root: html.HtmlElement) -> html.HtmlElement:
     """Try to find the main content area of the page."""
     
-    # Priority selectors for main content
-    content_selectors = [
-        'article',
-        'main',
-        '[role="main"]',
-        '.post-content',
-        '.article-content', 
-        '.entry-content',
-        '.content',
-        '#content',
-        '.post',
-        '.article',
-    ]
-    
-    for selector in content_selectors:
-        content = soup.select_one(selector)
-        if content and len(content.get_text(strip=True)) > 200:
-            return content
-    
-    # Fallback: find the div with the most text content
-    body = soup.find('body')
-    if body:
+    for xpath in _CONTENT_XPATHS:
+        matches = xpath(root)
+        if matches and len(_text(matches[0])) > 200:
+            return matches[0]
+    
+    # Fallback: use the body
+    body = root.find('.//body')
+    if body is not None:
         return body
     
-    return soup
+    return root
 
 
-def html_to_markdown(html: str, base_url: str = "") -> tuple[Optional[str], str]:
+def html_to_markdown(html_text: str, base_url: str = "") -> tuple[Optional[str], str]:
     """
     Convert HTML to clean markdown.
     Returns (title, markdown_content).
     """
-    soup = BeautifulSoup(html, 'lxml')
+    try:
+        # Parse from UTF-8 bytes so pages with an XML encoding declaration are accepted
+        root = html.fromstring(html_text.encode('utf-8'), parser=_HTML_PARSER)
+    except (etree.ParserError, ValueError):
+        return None, ""
+    
+    return tree_to_markdown(root, base_url)
+
+
+def bytes_to_markdown(
+    data: bytes,
+    encoding: Optional[str] = None,
+    base_url: str = ""
+) -> tuple[Optional[str], str]:
+    """
+    Parse raw HTML bytes and convert to clean markdown.
+    Top-level so it can run in a worker process.
+    """
+    parser = html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+    try:
+        root = html.fromstring(data, parser=parser)
+    except (etree.ParserError, ValueError):
+        return None, ""
+    return tree_to_markdown(root, base_url)
+
+
+def tree_to_markdown(root: html.HtmlElement, base_url: str = "") -> tuple[Optional[str], str]:
+    """
+    Convert a parsed HTML tree to clean markdown.
+    Returns (title, markdown_content).
+    """
+    # Strip noise tags from the whole tree in one C-level pass, before any
+    # Python-side walk (content scoring, cleaning) has to visit them
+    etree.strip_elements(root, *NOISE_TAGS, with_tail=False)
     
     # Extract title
     title = None
-    title_tag = soup.find('title')
-    if title_tag:
-        title = title_tag.get_text(strip=True)
+    title_text = root.findtext('.//title')
+    if title_text:
+        title = title_text.strip()
     
     # Find main content and clean it
-    content = find_main_content(soup)
+    content = find_main_content(root)
     content = clean_html(content)
     
-    # Fix relative URLs
+    # Fix relative URLs (lxml resolves them natively, honoring any <base href>)
     if base_url:
-        for tag in content.find_all(['a', 'img']):
-            attr = 'href' if tag.name == 'a' else 'src'
-            url = tag.get(attr, '')
-            if url and not url.startswith(('http://', 'https://', 'mailto:', 'tel:', '#')):
-                tag[attr] = urljoin(base_url, url)
+        root.resolve_base_href(handle_failures='discard')
+        content.make_links_absolute(base_url, handle_failures='discard')
     
     # Convert to markdown
-    markdown = md(
-        str(content),
-        heading_style="ATX",
-        bullets="-",
-        strip=['script', 'style'],
-    )
+    markdown = _emit_markdown(content)
     
     # Clean up excessive whitespace
-    markdown = re.sub(r'\n{3,}', '\n\n', markdown)
-    markdown = re.sub(r' +', ' ', markdown)
+    markdown = _BLANK_LINE_RE.sub('\n', markdown)
+    markdown = _MULTI_NL_RE.sub('\n\n', markdown)
     markdown = markdown.strip()
     
     return title, markdown
 
 
-async def fetch_url(client: httpx.AsyncClient, url: str) -> ScrapedPage:
-    """Fetch a single URL and convert to markdown."""
+async def fetch_url(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+) -> ScrapedPage:
+    """
+    Fetch a single URL and convert to markdown.
+    Successful pages are cached for a short while, and concurrent fetches of
+    the same URL share a single download, which is cancelled once every caller
+    waiting on it has gone.
+    """
+    state = _loop_state()
+    cached = state.page_cache.get(url)
+    if cached is not None:
+        log.info(f"[CACHED] {url}")
+        return cached
+    
+    return await state.page_fetches.run(url, lambda: _fetch_url(client, url, headers, timeout))
+
+
+async def _fetch_url(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: Optional[dict] = None,
+    timeout: Optional[float] = None,
+) -> ScrapedPage:
+    """Download a single URL and convert to markdown (uncached)."""
     log.info(f"[START] {url}")
     try:
-        response = await client.get(url, follow_redirects=True)
-        response.raise_for_status()
-        log.info(f"[FETCH] {url}")
+        request_timeout = httpx.Timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        async with client.stream(
+            "GET", url, headers=headers, timeout=request_timeout, follow_redirects=True
+        ) as response:
+            response.raise_for_status()
+            log.info(f"[FETCH] {url}")
+            
+            # Check if it's HTML before downloading the body
+            content_type = response.headers.get('content-type', '')
+            if 'text/html' not in content_type.lower():
+                log.warning(f"[ERROR] {url} - Not HTML: {content_type}")
+                return ScrapedPage(
+                    url=url,
+                    title=None,
+                    markdown="",
+                    success=False,
+                    error=f"Not HTML content: {content_type}"
+                )
+            
+            content_length = int(response.headers.get('content-length') or 0)
+            if content_length > MAX_HTML_BYTES:
+                log.warning(f"[ERROR] {url} - Too large: {content_length} bytes")
+                return ScrapedPage(
+                    url=url,
+                    title=None,
+                    markdown="",
+                    success=False,
+                    error=f"Page too large: {content_length} bytes"
+                )
+            
+            # Feed small bodies into the parser as they arrive; once a page outgrows
+            # OFFLOAD_THRESHOLD_BYTES, just buffer it for conversion in a worker process
+            encoding = response.charset_encoding
+            parser = html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+            blocks: list[bytes] = []
+            received = 0
+            async for block in response.aiter_bytes(STREAM_CHUNK_BYTES):
+                blocks.append(block)
+                received += len(block)
+                if parser is not None:
+                    if received > OFFLOAD_THRESHOLD_BYTES:
+                        parser = None
+                    else:
+                        parser.feed(block)
+                if received > MAX_HTML_BYTES:
+                    log.warning(f"{url} - Truncated at {received} bytes")
+                    break
         
-        # Check if it's HTML
-        content_type = response.headers.get('content-type', '')
-        if 'text/html' not in content_type.lower():
-            log.warning(f"[ERROR] {url} - Not HTML: {content_type}")
-            return ScrapedPage(
-                url=url,
-                title=None,
-                markdown="",
-                success=False,
-                error=f"Not HTML content: {content_type}"
+        if parser is None:
+            loop = asyncio.get_running_loop()
+            title, markdown = await loop.run_in_executor(
+                get_parse_pool(), bytes_to_markdown, b"".join(blocks), encoding, url
             )
-        
-        title, markdown = html_to_markdown(response.text, url)
+        else:
+            try:
+                root = parser.close()
+            except etree.XMLSyntaxError:
+                root = None
+            title, markdown = tree_to_markdown(root, url) if root is not None else (None, "")
         
         # Discard results with empty markdown content
         if not markdown or not markdown.strip():
@@ -254,6 +605,10 @@ async def fetch_url(client: httpx.AsyncClient, url: str) -> ScrapedPage:
                 error="Empty content after extraction"
             )
         
+        if len(markdown) > MAX_MARKDOWN_CHARS:
+            log.debug(f"{url} - Truncated markdown from {len(markdown)} chars")
+            markdown = markdown[:MAX_MARKDOWN_CHARS]
+        
         log.info(f"[COMPLETE] {url}")
         return ScrapedPage(
             url=url,
@@ -278,6 +633,7 @@ async def scrape_urls(
     timeout: float = 30.0,
     max_concurrent: int = 10,
     headers: Optional[dict] = None,
+    max_pages: Optional[int] = None,
 ) -> list[Document]:
     """
     Scrape multiple URLs concurrently and return LangChain Documents.
@@ -287,33 +643,40 @@ async def scrape_urls(
         timeout: Request timeout in seconds
         max_concurrent: Maximum concurrent requests
         headers: Optional custom headers
+        max_pages: Stop once this many pages succeeded (None scrapes every URL)
     
     Returns:
-        List of LangChain Document objects with markdown content
+        List of LangChain Document objects with markdown content, in input order
     """
-    default_headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-    }
-    if headers:
-        default_headers.update(headers)
-    
-    limits = httpx.Limits(max_connections=max_concurrent)
-    
-    async with httpx.AsyncClient(
-        headers=default_headers,
-        timeout=httpx.Timeout(timeout),
-        limits=limits,
-    ) as client:
-        tasks = [fetch_url(client, url) for url in urls]
-        results = await asyncio.gather(*tasks)
-    
-    # Filter out failed results and convert to Documents
-    successful_pages = [r for r in results if r.success]
-    discarded_count = len(results) - len(successful_pages)
-    if discarded_count > 0:
-        log.info(f"Discarded {discarded_count} failed result(s)")
+    client = get_client()
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def bounded_fetch(index: int, url: str) -> tuple[int, ScrapedPage]:
+        async with semaphore:
+            return index, await fetch_url(client, url, headers=headers, timeout=timeout)
+    
+    tasks = [asyncio.create_task(bounded_fetch(i, url)) for i, url in enumerate(urls)]
+    successful: list[tuple[int, ScrapedPage]] = []
+    failed_count = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, page = await next_done
+            if not page.success:
+                failed_count += 1
+                continue
+            successful.append((index, page))
+            if max_pages is not None and len(successful) >= max_pages:
+                break
+    finally:
+        # Cancel fetches that are no longer needed (or all of them if we were cancelled)
+        for task in tasks:
+            task.cancel()
+    
+    if failed_count > 0:
+        log.info(f"Discarded {failed_count} failed result(s)")
+    
+    successful.sort(key=lambda item: item[0])
+    successful_pages = [page for _, page in successful]
     
     # Convert to LangChain Documents
     documents = [page.to_document() for page in successful_pages]
@@ -334,6 +697,20 @@ async def scrape_urls_async(urls: list[str], **kwargs) -> list[Document]:
     return await scrape_urls(urls, **kwargs)
 
 
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the long-lived event loop used by the sync wrapper, starting it on first use.
+    Keeping one loop alive lets its client and caches survive across sync calls; they are
+    separate from the server loop's, so scrape() is safe to call from server worker threads.
+    """
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="scraper-loop", daemon=True).start()
+    return _sync_loop
+
+
 def scrape(urls: list[str], **kwargs) -> list[Document]:
     """
     Synchronous wrapper for scraping URLs.
@@ -345,7 +722,8 @@ def scrape(urls: list[str], **kwargs) -> list[Document]:
     Returns:
         List of LangChain Document objects
     """
-    return asyncio.run(scrape_urls(urls, **kwargs))
+    future = asyncio.run_coroutine_threadsafe(scrape_urls(urls, **kwargs), _get_sync_loop())
+    return future.result()
 
 
 
@@ -4,14 +4,120 @@ Search for URLs, scrape content, return LangChain Documents.
 """
 
 import asyncio
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+from urllib.parse import unquote_plus, urlsplit, urlunsplit
 from langchain_core.documents import Document
 from ddgs import DDGS
-from services.web_search.scraper import scrape_urls_async
-from tavily import TavilyClient
+from config import SEARCH_POOL_SIZE
+from services.web_search.scraper import get_client, scrape_urls_async
 from utils.logging import search_logger
 
 log = search_logger()
 
+# Query parameters that only track the click and never change the page content
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref_src"}
+# Links to files the scraper can't convert to markdown
+BINARY_EXTENSIONS = (
+    ".pdf", ".zip", ".gz", ".rar", ".7z", ".mp4", ".mp3", ".webm",
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg",
+)
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Sites left out of every search (exclude_domains for Tavily, filtered client-side for DuckDuckGo)
+EXCLUDED_DOMAINS = (
+    "en.wikipedia.org",
+    "britannica.com",
+    "quora.com",
+    "reddit.com",
+    "youtube.com",
+)
+# Matches URLs on an excluded domain or any of its subdomains
+_EXCLUDED_URL_RE = re.compile(
+    r"^https?://(?:[^/?#]*\.)?(?:" + "|".join(map(re.escape, EXCLUDED_DOMAINS)) + r")(?::\d+)?(?:[/?#]|$)",
+    re.IGNORECASE,
+)
+
+# Searches for more than this many results also query DuckDuckGo with these reformulations
+# on the first attempt, in parallel with the main search
+VARIANT_SEARCH_MIN_TARGET = 5
+QUERY_VARIANT_SUFFIXES = ("explained", "overview")
+
+# Each attempt asks for enough new URLs to cover the remaining pages at the observed scrape
+# success rate (starting from an assumed rate, never below the floor), capped per attempt
+INITIAL_SUCCESS_RATE = 0.5
+MIN_SUCCESS_RATE = 0.2
+MAX_BATCH_URLS = 30
+
+# Dedicated threads for the sync search SDKs, so searches don't queue behind other executor work
+_search_pool: Optional[ThreadPoolExecutor] = None
+
+# Shared DuckDuckGo client, so its session and cookies survive across searches
+_ddgs: Optional[DDGS] = None
+
+
+def get_ddgs() -> DDGS:
+    """Get or create the shared DuckDuckGo search client."""
+    global _ddgs
+    if _ddgs is None:
+        _ddgs = DDGS()
+    return _ddgs
+
+
+def get_search_pool() -> ThreadPoolExecutor:
+    """Get or create the thread pool used for blocking search SDK calls."""
+    global _search_pool
+    if _search_pool is None:
+        _search_pool = ThreadPoolExecutor(max_workers=SEARCH_POOL_SIZE, thread_name_prefix="search")
+    return _search_pool
+
+
+def shutdown_search_pool() -> None:
+    """Shut down the search thread pool (called on server shutdown)."""
+    global _search_pool
+    if _search_pool is not None:
+        _search_pool.shutdown(wait=False, cancel_futures=True)
+        _search_pool = None
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL: lowercase host, drop fragment and tracking parameters.
+    The remaining query parameters are kept byte-for-byte (no re-encoding), since
+    the canonical URL is the one that gets fetched.
+    """
+    parts = urlsplit(url)
+    query = "&".join(
+        param for param in parts.query.split("&")
+        if param and not _is_tracking_param(unquote_plus(param.partition("=")[0]))
+    )
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+def _is_tracking_param(key: str) -> bool:
+    return key.startswith("utm_") or key in TRACKING_PARAMS
+
+
+def url_key(url: str) -> int:
+    """
+    Dedup key for a canonical URL: scheme-, query-order- and trailing-slash-insensitive,
+    hashed to an int so the seen set stores small keys instead of full strings.
+    """
+    parts = urlsplit(url)
+    query = "&".join(sorted(parts.query.split("&"))) if parts.query else ""
+    return hash((parts.netloc, parts.path.rstrip("/"), query))
+
+
+def is_scrapeable(url: str) -> bool:
+    """Check that a URL is http(s) and doesn't point at a known binary file."""
+    parts = urlsplit(url)
+    return parts.scheme in ("http", "https") and not parts.path.lower().endswith(BINARY_EXTENSIONS)
+
+
 
 async def search_duckduckgo(query: str, num_results: int = 10) -> list[str]:
     """
@@ -24,15 +130,19 @@ async def search_duckduckgo(query: str, num_results: int = 10) -> list[str]:
     Returns:
         List of URLs from search results
     """
+    global _ddgs
     # DDGS is sync, so run in executor to not block
-    loop = asyncio.get_event_loop()
-    results = await loop.run_in_executor(
-        None, 
-        lambda: DDGS().text(query, max_results=num_results)
-    )
-    urls = [r['href'] for r in results if 'href' in r]
-    unique_urls = list(dict.fromkeys(urls))
-    return unique_urls
+    loop = asyncio.get_running_loop()
+    try:
+        results = await loop.run_in_executor(
+            get_search_pool(),
+            partial(get_ddgs().text, query, max_results=num_results)
+        )
+    except Exception:
+        # Start the next search with a fresh session in case this one is broken
+        _ddgs = None
+        raise
+    return [href for r in results if (href := r.get('href'))]
 
 async def search_tavily(query: str, exclusions: list[str], api_key: str = "", num_results: int = 10) -> list[str]:
     """
@@ -46,14 +156,108 @@ async def search_tavily(query: str, exclusions: list[str], api_key: str = "", nu
     Returns:
         List of URLs from search results
     """
-    loop = asyncio.get_event_loop()
-    results = await loop.run_in_executor(
-        None,
-        lambda: TavilyClient(api_key=api_key).search(query=query, exclude_domains=exclusions, max_results=num_results)
+    # Call the REST API directly on the shared async HTTP client (pooled, keep-alive)
+    response = await get_client().post(
+        TAVILY_SEARCH_URL,
+        json={"query": query, "exclude_domains": exclusions, "max_results": num_results},
+        headers={"Authorization": f"Bearer {api_key}"},
     )
-    urls = [result['url'] for result in results['results']]
-    unique_urls = list(dict.fromkeys(urls))
-    return unique_urls
+    response.raise_for_status()
+    return [result['url'] for result in response.json()['results']]
+
+async def search_first(
+    query: str,
+    exclusions: list[str],
+    tavily_api_key: str = "",
+    num_results: int = 10
+) -> list[str]:
+    """
+    Query DuckDuckGo and Tavily concurrently.
+    The first engine to return a full page of results wins and the other is cancelled;
+    short result lists are merged with the other engine's results instead.
+    Tavily is only queried when an API key is available.
+    
+    Args:
+        query: Search query string
+        exclusions: List of domains to exclude (Tavily)
+        tavily_api_key: Tavily API key
+        num_results: Number of results to fetch
+    
+    Returns:
+        List of URLs, first engine's results first (may contain duplicates)
+    """
+    tasks = {
+        asyncio.create_task(search_duckduckgo(query, num_results=num_results)): "DuckDuckGo",
+    }
+    if tavily_api_key:
+        tavily_task = asyncio.create_task(search_tavily(
+            query=query, exclusions=exclusions, api_key=tavily_api_key, num_results=num_results
+        ))
+        tasks[tavily_task] = "Tavily"
+    
+    urls: list[str] = []
+    pending = set(tasks)
+    try:
+        while pending and len(urls) < num_results:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    engine_urls = task.result()
+                except Exception as e:
+                    log.warning("%s search failed: %s", tasks[task], e)
+                    continue
+                log.debug("%s returned %d URLs", tasks[task], len(engine_urls))
+                urls.extend(engine_urls)
+        return urls
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def search_with_variants(
+    query: str,
+    exclusions: list[str],
+    tavily_api_key: str = "",
+    num_results: int = 10
+) -> tuple[list[str], list[str]]:
+    """
+    Run the main search alongside DuckDuckGo searches for reformulated queries,
+    all in parallel.
+    
+    Args:
+        query: Search query string
+        exclusions: List of domains to exclude (Tavily)
+        tavily_api_key: Tavily API key
+        num_results: Number of results to fetch per search
+    
+    Returns:
+        Tuple of (main search URLs, merged variant search URLs), which may contain duplicates
+    """
+    main_urls, *variant_results = await asyncio.gather(
+        search_first(
+            query,
+            exclusions=exclusions,
+            tavily_api_key=tavily_api_key,
+            num_results=num_results,
+        ),
+        *(
+            search_duckduckgo(f"{query} {suffix}", num_results=num_results)
+            for suffix in QUERY_VARIANT_SUFFIXES
+        ),
+        return_exceptions=True,
+    )
+    
+    if isinstance(main_urls, Exception):
+        log.warning("Main search failed: %s", main_urls)
+        main_urls = []
+    variant_urls: list[str] = []
+    for result in variant_results:
+        if isinstance(result, Exception):
+            log.warning("Variant search failed: %s", result)
+            continue
+        variant_urls.extend(result)
+    return main_urls, variant_urls
+
 
 async def search_and_scrape(
     query: str,
@@ -73,67 +277,71 @@ async def search_and_scrape(
         List of LangChain Document objects
     """
     successful_documents: list[Document] = []
-    seen_urls: set[str] = set()
+    # Lives for one call and holds at most a few hundred URL keys (max_attempts batches),
+    # so an exact set is cheaper than a probabilistic filter here
+    seen_urls: set[int] = set()
     attempt = 0
     offset = 0
+    scraped_count = 0
     
-    log.info(f"Query: '{query}' | Target: {target_count} results")
+    log.info("Query: '%s' | Target: %d results", query, target_count)
     
     while len(successful_documents) < target_count and attempt < max_attempts:
         
         attempt += 1
         needed = target_count - len(successful_documents)
         
-        # Fetch more URLs than needed to account for failures
-        fetch_count = needed + 5 + offset
-        log.debug(f"Attempt {attempt}: Fetching {fetch_count} URLs")
-
-        exclusions = [
-        'https://en.wikipedia.org',
-        'https://www.britannica.com',
-        'https://www.quora.com', 
-        'https://www.reddit.com', 
-        'https://www.youtube.com'
-        ]
-    
-        exclusion_str = ' '.join([f'-site:{e}' for e in exclusions])
-        search_query = f"{query} {exclusion_str}"
+        # Fetch more URLs than needed to account for failures, scaled by the success rate so far;
+        # results already returned are asked for again, so they count towards fetch_count
+        success_rate = len(successful_documents) / scraped_count if scraped_count else INITIAL_SUCCESS_RATE
+        batch = min(max(math.ceil(needed / max(success_rate, MIN_SUCCESS_RATE)), needed + 2), MAX_BATCH_URLS)
+        fetch_count = offset + batch
+        log.debug("Attempt %d: Fetching %d URLs", attempt, fetch_count)
 
-        urls = []
+        if attempt == 1 and target_count > VARIANT_SEARCH_MIN_TARGET:
+            # Large targets: widen the first round with parallel reformulated queries
+            main_urls, variant_urls = await search_with_variants(
+                query,
+                exclusions=list(EXCLUDED_DOMAINS),
+                tavily_api_key=tavily_api_key,
+                num_results=fetch_count,
+            )
+            urls = main_urls + variant_urls
+        else:
+            urls = main_urls = await search_first(
+                query,
+                exclusions=list(EXCLUDED_DOMAINS),
+                tavily_api_key=tavily_api_key,
+                num_results=fetch_count,
+            )
 
-        try:
-            log.debug("Trying DuckDuckGo search")
-            urls = await search_duckduckgo(search_query, num_results=fetch_count)
-        except Exception as e:
-            log.warning(f"DuckDuckGo search failed: {e}")
-            urls = []
-        
-        if not urls:
-            try:
-                log.debug("Trying Tavily search")
-                urls = await search_tavily(query=search_query, exclusions=[e.replace('https://www.', '').replace('https://', '') for e in exclusions], api_key=tavily_api_key, num_results=fetch_count)
-            except Exception as e:
-                log.warning(f"Tavily search failed: {e}")
-                urls = []
-
-        # Filter out already seen URLs
-        new_urls = [url for url in urls if url not in seen_urls]
-        seen_urls.update(new_urls)
+        # Drop binary links and excluded sites, canonicalize, and skip anything already seen, in one pass
+        new_urls = []
+        for url in urls:
+            if not is_scrapeable(url) or _EXCLUDED_URL_RE.match(url):
+                continue
+            url = canonicalize_url(url)
+            key = url_key(url)
+            if key not in seen_urls:
+                seen_urls.add(key)
+                new_urls.append(url)
         
         if not new_urls:
             log.debug("No new URLs found, stopping")
             break
         
-        log.debug(f"Found {len(new_urls)} new URLs to scrape")
+        log.debug("Found %d new URLs to scrape", len(new_urls))
         
-        # Scrape the new URLs (returns Documents now)
-        documents = await scrape_urls_async(new_urls)
+        # Scrape the new URLs, stopping (and cancelling the rest) once enough pages succeeded
+        documents = await scrape_urls_async(new_urls, max_pages=needed)
         successful_documents.extend(documents)
+        scraped_count += len(new_urls)
         
-        # Increase offset for next search to get different results
-        offset += fetch_count
+        # Skip past the main query's results on the next search; variant results and
+        # results merged in from the other engine don't advance its offset
+        offset = min(len(main_urls), fetch_count)
         
-        log.info(f"Progress: {len(successful_documents)}/{target_count} successful")
+        log.info("Progress: %d/%d successful", len(successful_documents), target_count)
     
     # Trim to target count if we got more
     return successful_documents[:target_count]
@@ -0,0 +1,89 @@
+"""
+Caching utilities - small in-memory TTL/LRU cache and single-flight helper shared by services.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """In-memory LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Runs one asyncio task per key and shares its result with every concurrent caller.
+    The task is cancelled once all callers waiting on it are gone, and successful
+    results are stored in the given cache from the task's done-callback.
+    """
+
+    def __init__(self, cache: TTLCache, should_cache: Callable[[Any], bool] = bool):
+        self.cache = cache
+        self.should_cache = should_cache
+        # In-flight tasks as [task, waiter count]
+        self._inflight: dict[Hashable, list] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the in-flight task for key, starting one with factory() if there is none."""
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(factory())
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._finished(key, done))
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not task.done():
+                # Forget the task now rather than in its done-callback, so a caller arriving
+                # before the cancellation lands starts a fresh task instead of joining this one
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+                task.cancel()
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drop a finished task from the in-flight map and cache its result if it succeeded."""
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if self.should_cache(result):
+            self.cache.set(key, result)
@@ -1,31 +1,80 @@
 """
 Text chunking utilities - shared text splitting functions.
 """
-from langchain_classic.text_splitter import RecursiveCharacterTextSplitter
+import re
+from bisect import bisect_left, bisect_right
+
 from langchain_core.documents import Document
 from config import CHUNK_SIZE, CHUNK_OVERLAP
 
+# Candidate break points, most preferred first: paragraph, line, sentence end, any whitespace
+_BREAK_RE = re.compile(r"(?P<paragraph>\n\n)|(?P<line>\n)|(?P<sentence>[.?!] )|(?P<space>\s)")
+_BREAK_LEVELS = ("paragraph", "line", "sentence", "space")
+
+
+def _last_break(levels: list[list[int]], start: int, limit: int) -> int:
+    """Return the last break in (start, limit] from the most preferred level that has one, else -1."""
+    for positions in levels:
+        idx = bisect_right(positions, limit) - 1
+        if idx >= 0 and positions[idx] > start:
+            return positions[idx]
+    return -1
 
-def get_text_splitter(
+
+def _fast_split(
+    text: str,
     chunk_size: int = CHUNK_SIZE,
     chunk_overlap: int = CHUNK_OVERLAP
-) -> RecursiveCharacterTextSplitter:
+) -> list[str]:
     """
-    Get a configured text splitter instance.
-    
+    Split text into windows of at most chunk_size characters in a single pass.
+    Break positions are found once with a precompiled regex, then consumed
+    greedily so each window ends on the last paragraph break that fits, falling
+    back to line, sentence and finally whitespace breaks.
+
     Args:
-        chunk_size: Target size for each chunk
-        chunk_overlap: Overlap between chunks
-        
+        text: Text to split
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Approximate overlap between consecutive chunks
+
     Returns:
-        Configured RecursiveCharacterTextSplitter
+        List of text chunks
     """
-    return RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", ".", "?", "!", " ", ""]
-    )
+    breaks = []
+    by_level: dict[str, list[int]] = {level: [] for level in _BREAK_LEVELS}
+    for m in _BREAK_RE.finditer(text):
+        breaks.append(m.end())
+        by_level[m.lastgroup].append(m.end())
+    levels = [by_level[level] for level in _BREAK_LEVELS]
+    length = len(text)
+    chunks = []
+    start = 0
+
+    while start < length:
+        if length - start <= chunk_size:
+            end = length
+        else:
+            # Last break that keeps the window within chunk_size, else hard cut
+            end = _last_break(levels, start, start + chunk_size)
+            if end < 0:
+                end = start + chunk_size
+
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= length:
+            break
+
+        # Start the next window on the first break inside the overlap region; windows no
+        # longer than the overlap (e.g. ended early on a paragraph break) are not repeated
+        if end - start <= chunk_overlap:
+            start = end
+            continue
+        idx = bisect_left(breaks, end - chunk_overlap)
+        next_start = breaks[idx] if idx < len(breaks) and breaks[idx] < end else end
+        start = next_start if next_start > start else end
+
+    return chunks
 
 
 def split_text(
@@ -35,17 +84,16 @@ def split_text(
 ) -> list[str]:
     """
     Split text into chunks using the standard splitter.
-    
+
     Args:
         text: Text to split
         chunk_size: Target size for each chunk
         chunk_overlap: Overlap between chunks
-        
+
     Returns:
         List of text chunks
     """
-    splitter = get_text_splitter(chunk_size, chunk_overlap)
-    return splitter.split_text(text)
+    return _fast_split(text, chunk_size, chunk_overlap)
 
 
 def split_documents(
@@ -55,17 +103,17 @@ def split_documents(
 ) -> list[Document]:
     """
     Split documents into smaller chunks.
-    
+
     Args:
         docs: List of LangChain Document objects
         chunk_size: Target size for each chunk
         chunk_overlap: Overlap between chunks
-        
+
     Returns:
         List of chunked Document objects
     """
-    if not docs:
-        return []
-    
-    splitter = get_text_splitter(chunk_size, chunk_overlap)
-    return splitter.split_documents(docs)
+    return [
+        Document(page_content=chunk, metadata=dict(doc.metadata))
+        for doc in docs
+        for chunk in _fast_split(doc.page_content, chunk_size, chunk_overlap)
+    ]
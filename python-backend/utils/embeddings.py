@@ -2,6 +2,8 @@
 Shared embedding model singleton for consistent embeddings across modules.
 Supports both SentenceTransformers and FastEmbed providers.
 """
+import threading
+
 import numpy as np
 import torch
 from typing import Optional, Protocol, Union
@@ -19,14 +21,60 @@ class EmbeddingModel(Protocol):
 class FastEmbedModel:
     """Wrapper for FastEmbed to match our interface."""
     
-    def __init__(self, model_name: str = EMBEDDING_MODEL):
-        providers = ["CUDAExecutionProvider"] if torch.cuda.is_available() else ["CPUExecutionProvider"]
-        self.model = TextEmbedding(model_name=model_name, providers=providers)
+    def __init__(self, model_name: str = EMBEDDING_MODEL, use_cuda: Optional[bool] = None):
+        if use_cuda is None:
+            use_cuda = torch.cuda.is_available()
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._load(use_cuda)
+    
+    def _load(self, use_cuda: bool) -> None:
+        """Load the model on the GPU or CPU execution provider."""
+        providers = ["CUDAExecutionProvider"] if use_cuda else ["CPUExecutionProvider"]
+        self.model = TextEmbedding(model_name=self.model_name, providers=providers)
+        self.use_cuda = use_cuda
     
     def encode(self, texts: list[str], **kwargs) -> np.ndarray:
-        """Encode texts using FastEmbed."""
-        embeddings = list(self.model.embed(texts))
-        return np.array(embeddings, dtype=np.float32)
+        """
+        Encode texts using FastEmbed, falling back to CPU if the GPU fails.
+        Texts are encoded in length order so each batch pads to a similar length,
+        and the embeddings are returned in the original order.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        sorted_texts = [texts[i] for i in order]
+        model, on_gpu = self.model, self.use_cuda
+        try:
+            embeddings = list(model.embed(sorted_texts))
+        except Exception:
+            # ONNX Runtime errors are pybind exceptions, not RuntimeError subclasses
+            if not on_gpu:
+                raise
+            # GPU failure (e.g. out of memory) - reload on CPU and retry. Encodes run
+            # concurrently in worker threads, so only the first failing one swaps the model.
+            with self._lock:
+                if self.model is model:
+                    self._load(use_cuda=False)
+                model = self.model
+            embeddings = list(model.embed(sorted_texts))
+        
+        # Scatter back into one C-contiguous float32 block in the caller's order
+        result = np.empty((len(texts), len(embeddings[0])), dtype=np.float32)
+        result[order] = embeddings
+        return result
+
+# Singleton embedding model
+_model: Optional[FastEmbedModel] = None
+
+
+def get_embedding_model() -> FastEmbedModel:
+    """Get or create the shared embedding model (loaded once per process)."""
+    global _model
+    if _model is None:
+        _model = FastEmbedModel()
+    return _model
 
 
 # ChromaDB embedding adapter
@@ -35,7 +83,7 @@ try:
         """Adapter for using FastEmbedModel with ChromaDB."""
         
         def __call__(self, input: Documents) -> Embeddings:
-            model = FastEmbedModel()
+            model = get_embedding_model()
             embeddings = model.encode(input)
             return embeddings.tolist()
 except ImportError:
@@ -1,3 +1,7 @@
+import re
+
+# Collapses runs of non-newline whitespace in the static templates
+_WS = re.compile(r"[^\S\n]+")
 
 # Prompt template for queries with RAG context (web search or document results)
 PROMPT_WITH_CONTEXT = """You are an AI assistant tasked with providing detailed answers based solely on the given context. Your goal is to analyze the information provided and formulate a comprehensive, well-structured response to the question.
@@ -30,6 +34,7 @@ Format your response as follows:
 5. Ensure proper grammar, punctuation, and spelling throughout your answer.
 
 Important: Base your entire response solely on the information provided in the context. Do not include any external knowledge or assumptions not present in the given text."""
+PROMPT_WITH_CONTEXT = _WS.sub(" ", PROMPT_WITH_CONTEXT)
 
 # Base formatting instructions for regular queries (no context)
 BASE_PROMPT = """
@@ -41,6 +46,7 @@ Format your response as follows:
 5. Use bullet points or numbered lists where appropriate to break down complex information or present a series of related points.
 6. If relevant, include any headings or subheadings to structure your response.
 7. Ensure proper grammar, punctuation, and spelling throughout your answer."""
+BASE_PROMPT = _WS.sub(" ", BASE_PROMPT)
 
 # Query Expansion Prompt
 QUERY_EXPANSION_PROMPT = """You are a search query optimizer. Your task is to analyze the conversation context and generate an optimized web search query.
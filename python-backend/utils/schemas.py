@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+import asyncio
+
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -51,9 +52,17 @@ class ModelResponse(BaseModel):
     data: List[ModelID]
 
 class RequestState:
-    def __init__(self, request_id: int, app: FastAPI):
+    """Per-request disconnect flag, set once by a watcher on the ASGI receive channel."""
+
+    def __init__(self, request_id: int):
         self.request_id = request_id
-        self.app = app
+        self._disconnected = asyncio.Event()
 
     def is_disconnected(self) -> bool:
-        return not hasattr(self.app.state, 'active_requests') or self.request_id not in self.app.state.active_requests
\ No newline at end of file
+        return self._disconnected.is_set()
+
+    def mark_disconnected(self) -> None:
+        self._disconnected.set()
+
+    async def wait_disconnected(self) -> None:
+        await self._disconnected.wait()
\ No newline at end of file